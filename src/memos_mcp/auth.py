@@ -1,22 +1,67 @@
 """Authentication middleware for Memos MCP server."""
 
+import functools
 import hashlib
+import hmac
+import json
 import logging
-from typing import Callable, Optional
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import JSONResponse
+import time
+from typing import Optional
+from urllib.parse import parse_qsl
 
 logger = logging.getLogger(__name__)
 
+# Length of a SHA256 hex digest; anything else is rejected before hitting the cache
+TOKEN_HASH_LENGTH = 64
+
+# Minimum seconds between warning summaries of rejected requests
+REJECTION_LOG_INTERVAL = 5.0
+
+
+def compute_token_digest(token: str) -> bytes:
+    """Compute the raw SHA256 digest of the access token."""
+    return hashlib.sha256(token.encode()).digest()
+
 
 def compute_token_hash(token: str) -> str:
     """Compute SHA256 hash of the access token."""
-    return hashlib.sha256(token.encode()).hexdigest()
+    return compute_token_digest(token).hex()
+
 
+@functools.lru_cache(maxsize=128)
+def _check_token_hash(provided: str, expected: bytes) -> bool:
+    """Check a provided hex token hash against the expected digest (cached)."""
+    try:
+        provided_bytes = bytes.fromhex(provided)
+    except ValueError:
+        return False
+    return hmac.compare_digest(provided_bytes, expected)
 
-class TokenAuthMiddleware(BaseHTTPMiddleware):
-    """Middleware that validates SHA256 hash of access token from query parameter."""
+
+def _build_unauthorized_response(content: dict) -> tuple:
+    """Pre-encode the headers and body of a 401 JSON response."""
+    body = json.dumps(content).encode()
+    headers = (
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    )
+    return headers, body
+
+
+class TokenAuthMiddleware:
+    """ASGI middleware that validates SHA256 hash of access token from query parameter."""
+    
+    # Pre-serialized 401 headers and bodies so rejections never re-encode JSON
+    MISSING_TOKEN_RESPONSE = _build_unauthorized_response({
+        "error": "Authentication required",
+        "message": "Token query parameter is required. Access URL format: /mcp?token=<sha256_hash>",
+        "code": "MISSING_TOKEN"
+    })
+    INVALID_TOKEN_RESPONSE = _build_unauthorized_response({
+        "error": "Authentication failed",
+        "message": "Invalid token provided",
+        "code": "INVALID_TOKEN"
+    })
     
     def __init__(self, app, access_token: str, enabled: bool = True):
         """
@@ -27,63 +72,108 @@ class TokenAuthMiddleware(BaseHTTPMiddleware):
             access_token: The actual access token to validate against
             enabled: Whether authentication is enabled (default: True)
         """
-        super().__init__(app)
-        self.expected_token_hash = compute_token_hash(access_token) if enabled else None
+        self.app = app
         self.enabled = enabled
         
+        # Compare raw digest bytes rather than hex strings, in constant time
+        self._expected_hash_bytes = compute_token_digest(access_token) if enabled else b""
+        self.expected_token_hash = self._expected_hash_bytes.hex() if enabled else None
+        self._expected_hash_prefix = self.expected_token_hash[:8] if enabled else ""
+        
+        # Rejections are summarised periodically instead of logged one by one
+        self._reject_count = 0
+        self._last_reject_log = float("-inf")
+        self._last_reject_reason = ""
+        self._last_reject_host = "unknown"
+        
         if enabled:
-            logger.info("Token authentication enabled. Expected token hash: %s", 
-                       self.expected_token_hash[:8] + "...")
+            logger.info("Token authentication enabled. Expected token hash: %s...", 
+                       self._expected_hash_prefix)
 
-    async def dispatch(self, request: Request, call_next: Callable) -> JSONResponse:
+    async def __call__(self, scope, receive, send) -> None:
         """
-        Process the request and validate token if authentication is enabled.
+        Process the connection and validate token if authentication is enabled.
         
         Args:
-            request: The incoming HTTP request
-            call_next: The next middleware/handler in the chain
-            
-        Returns:
-            Response from the next handler or 401 if authentication fails
+            scope: The ASGI connection scope
+            receive: The ASGI receive channel
+            send: The ASGI send channel
         """
-        # Skip authentication if disabled
-        if not self.enabled:
-            return await call_next(request)
+        # Skip authentication if disabled or for non-HTTP traffic (e.g. lifespan)
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
         
-        # Extract token from query parameters
-        provided_token_hash = request.query_params.get("token")
+        # Extract token from query parameters, decoding the raw query string
+        # the way Starlette does so non-ASCII values cannot raise here
+        query = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1"),
+                               keep_blank_values=True))
+        provided_token_hash = query.get("token", "")
         
         if not provided_token_hash:
-            logger.warning("Request rejected: Missing token query parameter from %s", 
-                          request.client.host if request.client else "unknown")
-            return JSONResponse(
-                status_code=401,
-                content={
-                    "error": "Authentication required",
-                    "message": "Token query parameter is required. Access URL format: /mcp?token=<sha256_hash>",
-                    "code": "MISSING_TOKEN"
-                }
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Request rejected: Missing token query parameter from %s",
+                            self._client_host(scope))
+            self._record_rejection("missing token", scope)
+            await self._send_unauthorized(send, self.MISSING_TOKEN_RESPONSE)
+            return
         
         # Validate token hash
-        if provided_token_hash != self.expected_token_hash:
-            logger.warning("Request rejected: Invalid token hash from %s. Provided: %s, Expected: %s...", 
-                          request.client.host if request.client else "unknown",
-                          provided_token_hash[:8] + "..." if len(provided_token_hash) > 8 else provided_token_hash,
-                          self.expected_token_hash[:8] + "...")
-            return JSONResponse(
-                status_code=401,
-                content={
-                    "error": "Authentication failed",
-                    "message": "Invalid token provided",
-                    "code": "INVALID_TOKEN"
-                }
-            )
+        if (len(provided_token_hash) != TOKEN_HASH_LENGTH
+                or not _check_token_hash(provided_token_hash, self._expected_hash_bytes)):
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Request rejected: Invalid token hash from %s. Provided: %s, Expected: %s...", 
+                            self._client_host(scope),
+                            provided_token_hash[:8] + "..." if len(provided_token_hash) > 8 else provided_token_hash,
+                            self._expected_hash_prefix)
+            self._record_rejection("invalid token", scope)
+            await self._send_unauthorized(send, self.INVALID_TOKEN_RESPONSE)
+            return
         
         # Token is valid, proceed with the request
-        logger.debug("Request authenticated successfully from %s", 
-                    request.client.host if request.client else "unknown")
-        return await call_next(request)
+        if self._reject_count:
+            self._report_rejections()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Request authenticated successfully from %s", self._client_host(scope))
+        await self.app(scope, receive, send)
+
+    def _record_rejection(self, reason: str, scope) -> None:
+        """Count a rejected request and log a summary at most once per interval."""
+        self._reject_count += 1
+        self._last_reject_reason = reason
+        self._last_reject_host = self._client_host(scope)
+        self._report_rejections()
+
+    def _report_rejections(self) -> None:
+        """
+        Log the pending rejection summary unless one was logged within the interval.
+        
+        Called on every rejection and on the next authenticated request, so a
+        burst that ends inside the interval is reported once traffic resumes.
+        Rejections followed by no further requests at all are not reported.
+        """
+        now = time.monotonic()
+        if now - self._last_reject_log < REJECTION_LOG_INTERVAL:
+            return
+        
+        logger.warning("Rejected %d unauthenticated request(s) since last report. Latest: %s from %s",
+                      self._reject_count, self._last_reject_reason, self._last_reject_host)
+        self._reject_count = 0
+        self._last_reject_log = now
+
+    @staticmethod
+    def _client_host(scope) -> str:
+        """Get the client host from the ASGI scope for logging."""
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    @staticmethod
+    async def _send_unauthorized(send, response: tuple) -> None:
+        """Send a pre-built 401 response (header pairs, body bytes)."""
+        headers, body = response
+        # Fresh message dicts per request: wrapping middleware may mutate them
+        await send({"type": "http.response.start", "status": 401, "headers": list(headers)})
+        await send({"type": "http.response.body", "body": body, "more_body": False})
 
 
 def create_auth_url(base_url: str, token: str, enabled: bool = True) -> str:
@@ -6,15 +6,9 @@ from pathlib import Path
 from typing import Optional
 
 import typer
-import uvicorn
 from rich.console import Console
-from rich.table import Table
-from rich.text import Text
 
-from .config import get_api_config, get_server_config, create_env_template, validate_environment
-from .client import MemosClient
-from .models import CreateMemoRequest
-from .auth import create_auth_url
+from .config import get_auth_enabled, create_env_template, validate_environment
 
 app = typer.Typer(
     name="memos-mcp",
@@ -23,6 +17,48 @@ app = typer.Typer(
 console = Console()
 
 
+def _print_created_memo(memo) -> None:
+    """Display the details of a newly created memo."""
+    from rich.table import Table
+    
+    table = Table(title="Created Memo")
+    table.add_column("Field", style="cyan")
+    table.add_column("Value", style="green")
+    
+    table.add_row("Content", memo.get_text())
+    table.add_row("Tags", ", ".join(memo.tags) if memo.tags else "None")
+    table.add_row("Visibility", memo.visibility or "PRIVATE")
+    if memo.get_created_at():
+        table.add_row("Created", memo.get_created_at().strftime("%Y-%m-%d %H:%M:%S"))
+    
+    console.print(table)
+
+
+def _print_memo_list(memos, title: str) -> None:
+    """Display a list of memos in a table."""
+    from rich.table import Table
+    
+    table = Table(title=title)
+    table.add_column("ID", style="dim")
+    table.add_column("Content", max_width=50)
+    table.add_column("Tags", style="cyan")
+    table.add_column("Created", style="green")
+    
+    for memo in memos:
+        content = memo.get_text()[:47] + "..." if len(memo.get_text()) > 50 else memo.get_text()
+        tags = ", ".join(memo.tags) if memo.tags else "-"
+        created = memo.get_created_at().strftime("%m-%d %H:%M") if memo.get_created_at() else "-"
+        
+        table.add_row(
+            str(memo.id) if memo.id else "-",
+            content,
+            tags,
+            created
+        )
+    
+    console.print(table)
+
+
 @app.command()
 def serve(
     host: str = typer.Option(None, "--host", "-h", help="Server host"),
@@ -32,8 +68,7 @@ def serve(
 ):
     """Start the Memos MCP server."""
     try:
-        validate_environment()
-        server_config = get_server_config()
+        api_config, server_config = validate_environment()
         
         # Override with CLI arguments if provided
         host = host or server_config.host
@@ -45,11 +80,10 @@ def serve(
         
         # Display authentication info
         try:
-            import os
-            auth_enabled = os.getenv("ENABLE_TOKEN_AUTH", "true").lower() in ("true", "1", "yes")
+            from .auth import create_auth_url
+            auth_enabled = get_auth_enabled()
             
             if auth_enabled:
-                api_config = get_api_config()
                 base_url = f"http://{host}:{port}/mcp"
                 auth_url = create_auth_url(base_url, api_config.access_token, auth_enabled)
                 console.print(f"🔐 Authentication: Enabled", style="cyan")
@@ -64,6 +98,8 @@ def serve(
             console.print("🔄 Auto-reload enabled", style="yellow")
         
         # Import and run the FastMCP server directly
+        import importlib.util
+        import uvicorn
         from .server import app
         
         if reload:
@@ -82,7 +118,9 @@ def serve(
                 "memos_mcp.server:http_app",
                 host=host,
                 port=port,
-                log_level=log_level.lower()
+                log_level=log_level.lower(),
+                # main() already installed the uvloop policy when it is available
+                loop="uvloop" if importlib.util.find_spec("uvloop") else "auto"
             )
         
     except Exception as e:
@@ -117,10 +155,11 @@ def init():
 @app.command()
 def test():
     """Test connection to Memos API."""
+    from .client import MemosClient
+    
     async def _test_connection():
         try:
-            validate_environment()
-            config = get_api_config()
+            config, _ = validate_environment()
             
             console.print("🔗 Testing connection to Memos API...", style="blue")
             
@@ -148,15 +187,15 @@ def create(
     tags: Optional[str] = typer.Option(None, "--tags", "-t", help="Comma-separated tags"),
 ):
     """Create a new memo."""
+    from .client import MemosClient
+    from .models import CreateMemoRequest, split_tags
+    
     async def _create_memo():
         try:
-            validate_environment()
-            config = get_api_config()
+            config, _ = validate_environment()
             
             # Parse tags
-            tag_list = []
-            if tags:
-                tag_list = [tag.strip().lstrip('#') for tag in tags.split(',') if tag.strip()]
+            tag_list = split_tags(tags) if tags else []
             
             request = CreateMemoRequest(
                 content=content,
@@ -169,19 +208,7 @@ def create(
                 memo = await client.create_memo(request)
                 
                 console.print("✅ Memo created successfully!", style="green bold")
-                
-                # Display memo details
-                table = Table(title="Created Memo")
-                table.add_column("Field", style="cyan")
-                table.add_column("Value", style="green")
-                
-                table.add_row("Content", memo.get_text())
-                table.add_row("Tags", ", ".join(memo.tags) if memo.tags else "None")
-                table.add_row("Visibility", memo.visibility or "PRIVATE")
-                if memo.get_created_at():
-                    table.add_row("Created", memo.get_created_at().strftime("%Y-%m-%d %H:%M:%S"))
-                
-                console.print(table)
+                _print_created_memo(memo)
                 return True
                 
         except Exception as e:
@@ -198,40 +225,22 @@ def list(
     offset: int = typer.Option(0, "--offset", "-o", help="Number of memos to skip"),
 ):
     """List recent memos."""
+    from .client import MemosClient
+    
     async def _list_memos():
         try:
-            validate_environment()
-            config = get_api_config()
+            config, _ = validate_environment()
             
             console.print(f"📋 Fetching {limit} memos...", style="blue")
             
             async with MemosClient(config) as client:
-                memos = await client.get_all_memos(limit=limit, offset=offset)
+                memos, _ = await client.get_all_memos(limit=limit, offset=offset)
                 
                 if not memos:
                     console.print("📭 No memos found", style="yellow")
                     return True
                 
-                # Display memos in a table
-                table = Table(title=f"Recent Memos (showing {len(memos)})")
-                table.add_column("ID", style="dim")
-                table.add_column("Content", max_width=50)
-                table.add_column("Tags", style="cyan")
-                table.add_column("Created", style="green")
-                
-                for memo in memos:
-                    content = memo.get_text()[:47] + "..." if len(memo.get_text()) > 50 else memo.get_text()
-                    tags = ", ".join(memo.tags) if memo.tags else "-"
-                    created = memo.get_created_at().strftime("%m-%d %H:%M") if memo.get_created_at() else "-"
-                    
-                    table.add_row(
-                        memo.id or "-",
-                        content,
-                        tags,
-                        created
-                    )
-                
-                console.print(table)
+                _print_memo_list(memos, title=f"Recent Memos (showing {len(memos)})")
                 return True
                 
         except Exception as e:
@@ -242,13 +251,94 @@ def list(
     sys.exit(0 if success else 1)
 
 
+@app.command()
+def repl():
+    """Start an interactive session that reuses one connection to Memos."""
+    import shlex
+    from .client import MemosClient
+    from .models import CreateMemoRequest, SearchQuery, split_tags
+    
+    usage = (
+        "Commands: list [limit] [offset], create <content> [tags], "
+        "search <query>, test, quit"
+    )
+    
+    async def _handle(client: MemosClient, args) -> None:
+        command, rest = args[0].lower(), args[1:]
+        
+        if command == "test":
+            if await client.test_connection():
+                console.print("✅ Successfully connected to Memos API", style="green bold")
+            else:
+                console.print("❌ Failed to connect to Memos API", style="red bold")
+        elif command == "list":
+            limit = int(rest[0]) if rest else 10
+            offset = int(rest[1]) if len(rest) > 1 else 0
+            memos, _ = await client.get_all_memos(limit=limit, offset=offset)
+            if memos:
+                _print_memo_list(memos, title=f"Recent Memos (showing {len(memos)})")
+            else:
+                console.print("📭 No memos found", style="yellow")
+        elif command == "create" and rest:
+            tag_list = split_tags(rest[1]) if len(rest) > 1 else []
+            memo = await client.create_memo(CreateMemoRequest(content=rest[0], tags=tag_list))
+            console.print("✅ Memo created successfully!", style="green bold")
+            _print_created_memo(memo)
+        elif command == "search" and rest:
+            memos, _ = await client.search_memos(SearchQuery(query=" ".join(rest)))
+            if memos:
+                _print_memo_list(memos, title=f"Search Results (showing {len(memos)})")
+            else:
+                console.print("📭 No memos found", style="yellow")
+        else:
+            console.print(usage, style="yellow", markup=False)
+    
+    async def _repl():
+        try:
+            config, _ = validate_environment()
+        except Exception as e:
+            console.print(f"❌ Failed to start session: {e}", style="red bold")
+            return False
+        
+        console.print("💬 Interactive Memos session. " + usage, style="blue", markup=False)
+        
+        async with MemosClient(config) as client:
+            while True:
+                try:
+                    line = typer.prompt("memos", prompt_suffix="> ")
+                except typer.Abort:
+                    break
+                
+                try:
+                    args = shlex.split(line)
+                except ValueError as e:
+                    console.print(f"❌ Invalid input: {e}", style="red")
+                    continue
+                
+                if not args:
+                    continue
+                if args[0].lower() in ("quit", "exit"):
+                    break
+                
+                try:
+                    await _handle(client, args)
+                except Exception as e:
+                    console.print(f"❌ Command failed: {e}", style="red bold")
+        
+        return True
+    
+    success = asyncio.run(_repl())
+    sys.exit(0 if success else 1)
+
+
 @app.command()
 def info():
     """Show server configuration and status."""
+    from rich.table import Table
+    from rich.text import Text
+    
     try:
-        validate_environment()
-        api_config = get_api_config()
-        server_config = get_server_config()
+        api_config, server_config = validate_environment()
         
         # Configuration table
         config_table = Table(title="Server Configuration")
@@ -280,8 +370,20 @@ def info():
         sys.exit(1)
 
 
+def _install_uvloop() -> bool:
+    """Use uvloop as the asyncio event loop policy when it is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
 def main():
     """Main CLI entry point."""
+    _install_uvloop()
     app()
 
 
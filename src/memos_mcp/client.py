@@ -3,9 +3,13 @@
 import asyncio
 import json
 import logging
-from typing import List, Optional, Dict, Any
+import math
+import random
+import re
+from typing import Callable, FrozenSet, Iterator, List, Optional, Dict, Any, Tuple, Union
 from datetime import datetime
 import httpx
+import orjson
 from .models import (
     Memo, 
     CreateMemoRequest, 
@@ -16,6 +20,24 @@ from .models import (
 
 logger = logging.getLogger(__name__)
 
+# Hashtags embedded in memo content, e.g. "#work"
+_HASHTAG_RE = re.compile(r'#(\w+)')
+
+# Upper bound for a single retry backoff window, in seconds
+MAX_BACKOFF_SECONDS = 30
+
+# Connection pool tuning for the shared HTTP client. Transport-level retries
+# stay at httpx's default of 0 since _make_request handles retries itself.
+CONNECTION_LIMITS = httpx.Limits(
+    max_keepalive_connections=20,
+    max_connections=50,
+    keepalive_expiry=30.0,
+)
+CONNECT_TIMEOUT_SECONDS = 5.0
+
+# Precomputed (created_ts from, created_ts to, tag set) search filters
+SearchFilters = Tuple[Optional[int], Optional[int], Optional[FrozenSet[str]]]
+
 
 class MemosAPIError(Exception):
     """Base exception for Memos API errors."""
@@ -35,10 +57,27 @@ class MemosRateLimitError(MemosAPIError):
 class MemosClient:
     """Async HTTP client for Memos API operations."""
     
-    def __init__(self, config: ApiConfig):
-        """Initialize the Memos client with configuration."""
+    def __init__(self, config: ApiConfig, http_client: Optional[httpx.AsyncClient] = None):
+        """
+        Initialize the Memos client with configuration.
+        
+        Args:
+            config: API configuration
+            http_client: Optional pre-existing HTTP client to reuse. Its headers
+                are updated with the Memos auth headers and it is not closed
+                by this client.
+        """
         self.config = config
-        self._client: Optional[httpx.AsyncClient] = None
+        self._client: Optional[httpx.AsyncClient] = http_client
+        
+        # Endpoint URLs are fixed for the lifetime of the client
+        api_root = f"{config.base_url}/api/{config.api_version}"
+        self._memos_url = f"{api_root}/memos"
+        self._user_url = f"{api_root}/user"
+        self._owns_client = http_client is None
+        
+        if http_client is not None:
+            http_client.headers.update(self._build_headers())
         
     async def __aenter__(self):
         """Async context manager entry."""
@@ -49,25 +88,34 @@ class MemosClient:
         """Async context manager exit."""
         await self.close()
     
+    def _build_headers(self) -> Dict[str, str]:
+        """Build the default headers sent with every Memos API request."""
+        return {
+            "Authorization": f"Bearer {self.config.access_token}",
+            "Content-Type": "application/json",
+            "User-Agent": "memos-mcp/0.1.0",
+        }
+    
     async def _ensure_client(self) -> None:
         """Ensure HTTP client is initialized."""
         if self._client is None:
-            headers = {
-                "Authorization": f"Bearer {self.config.access_token}",
-                "Content-Type": "application/json",
-                "User-Agent": "memos-mcp/0.1.0",
-            }
-            
             self._client = httpx.AsyncClient(
-                headers=headers,
-                timeout=httpx.Timeout(self.config.timeout),
+                headers=self._build_headers(),
+                timeout=httpx.Timeout(
+                    self.config.timeout,
+                    connect=min(CONNECT_TIMEOUT_SECONDS, self.config.timeout),
+                ),
                 follow_redirects=True,
+                http2=True,
+                limits=CONNECTION_LIMITS,
             )
+            self._owns_client = True
     
     async def close(self) -> None:
         """Close the HTTP client."""
         if self._client:
-            await self._client.aclose()
+            if self._owns_client:
+                await self._client.aclose()
             self._client = None
     
     async def _make_request(
@@ -79,47 +127,82 @@ class MemosClient:
         """Make an HTTP request with retry logic and error handling."""
         await self._ensure_client()
         
-        for attempt in range(self.config.max_retries + 1):
+        # Happy path: a single attempt, no retry bookkeeping
+        try:
+            response = await self._client.request(method, url, **kwargs)
+        except httpx.RequestError as e:
+            return await self._retry_request(method, url, e, **kwargs)
+        
+        if response.status_code == 429:
+            return await self._retry_request(method, url, response, **kwargs)
+        
+        return self._build_response(response)
+    
+    async def _retry_request(
+        self,
+        method: str,
+        url: str,
+        failure: Union[httpx.Response, httpx.RequestError],
+        **kwargs
+    ) -> MemosApiResponse:
+        """Retry a rate-limited or failed request with jittered exponential backoff."""
+        for attempt in range(1, self.config.max_retries + 1):
+            wait_time = self._retry_delay(attempt, failure)
+            if isinstance(failure, httpx.Response):
+                logger.warning("Rate limited, waiting %.2fs before retry", wait_time)
+            else:
+                logger.warning("Request failed, retrying in %.2fs: %s", wait_time, failure)
+            await asyncio.sleep(wait_time)
+            
             try:
                 response = await self._client.request(method, url, **kwargs)
-                
-                # Handle rate limiting
-                if response.status_code == 429:
-                    if attempt < self.config.max_retries:
-                        wait_time = 2 ** attempt  # Exponential backoff
-                        logger.warning(f"Rate limited, waiting {wait_time}s before retry")
-                        await asyncio.sleep(wait_time)
-                        continue
-                    else:
-                        raise MemosRateLimitError("Rate limit exceeded")
-                
-                # Handle authentication errors
-                if response.status_code == 401:
-                    raise MemosAuthenticationError("Invalid access token")
-                
-                # Parse response
-                try:
-                    data = response.json() if response.content else {}
-                except json.JSONDecodeError:
-                    data = {"raw_content": response.text}
-                
-                return MemosApiResponse(
-                    status=response.status_code,
-                    data=data,
-                    success=200 <= response.status_code < 300,
-                    message=data.get("message") if isinstance(data, dict) else None
-                )
-                
             except httpx.RequestError as e:
-                if attempt < self.config.max_retries:
-                    wait_time = 2 ** attempt
-                    logger.warning(f"Request failed, retrying in {wait_time}s: {e}")
-                    await asyncio.sleep(wait_time)
-                    continue
-                else:
-                    raise MemosAPIError(f"Request failed after {self.config.max_retries} retries: {e}")
+                failure = e
+                continue
+            
+            if response.status_code != 429:
+                return self._build_response(response)
+            failure = response
+        
+        if isinstance(failure, httpx.Response):
+            raise MemosRateLimitError("Rate limit exceeded")
+        raise MemosAPIError(f"Request failed after {self.config.max_retries} retries: {failure}")
+    
+    @staticmethod
+    def _retry_delay(attempt: int, failure: Union[httpx.Response, httpx.RequestError]) -> float:
+        """Compute the wait before a retry, honoring Retry-After on 429 responses."""
+        if isinstance(failure, httpx.Response):
+            retry_after = failure.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    delay = float(retry_after)
+                except ValueError:
+                    delay = math.nan  # HTTP-date form; fall back to backoff
+                # Capped like the backoff so a server cannot stall a tool call for long
+                if math.isfinite(delay):
+                    return min(max(0.0, delay), MAX_BACKOFF_SECONDS)
+        
+        # Full jitter over the exponential backoff window (1s, 2s, 4s, ...)
+        return random.uniform(0, min(2 ** (attempt - 1), MAX_BACKOFF_SECONDS))
+    
+    def _build_response(self, response: httpx.Response) -> MemosApiResponse:
+        """Convert an HTTP response into a MemosApiResponse."""
+        # Handle authentication errors
+        if response.status_code == 401:
+            raise MemosAuthenticationError("Invalid access token")
         
-        raise MemosAPIError("Unexpected error in request handling")
+        # Parse response
+        try:
+            data = orjson.loads(response.content) if response.content else {}
+        except (orjson.JSONDecodeError, json.JSONDecodeError):
+            data = {"raw_content": response.text}
+        
+        return MemosApiResponse(
+            status=response.status_code,
+            data=data,
+            success=200 <= response.status_code < 300,
+            message=data.get("message") if isinstance(data, dict) else None
+        )
     
     async def create_memo(self, request: CreateMemoRequest) -> Memo:
         """Create a new memo using the Memos API."""
@@ -135,8 +218,7 @@ class MemosClient:
             "pinned": request.pinned
         }
         
-        url = f"{self.config.base_url}/api/{self.config.api_version}/memos"
-        response = await self._make_request("POST", url, json=payload)
+        response = await self._make_request("POST", self._memos_url, content=orjson.dumps(payload))
         
         if not response.success:
             error_msg = response.data.get("message", "Failed to create memo")
@@ -150,9 +232,12 @@ class MemosClient:
         self, 
         limit: int = 50, 
         offset: int = 0
-    ) -> List[Memo]:
-        """Get all memos with pagination."""
-        url = f"{self.config.base_url}/api/{self.config.api_version}/memos"
+    ) -> Tuple[List[Memo], bool]:
+        """Get all memos with pagination.
+        
+        Returns:
+            The page of memos, and whether another page is available
+        """
         params = {
             "pageSize": limit,
             "pageToken": str(offset) if offset > 0 else None
@@ -161,28 +246,21 @@ class MemosClient:
         # Remove None values
         params = {k: v for k, v in params.items() if v is not None}
         
-        response = await self._make_request("GET", url, params=params)
+        response = await self._make_request("GET", self._memos_url, params=params)
         
         if not response.success:
-            logger.warning(f"Failed to get memos: {response.data}")
-            return []
+            logger.warning("Failed to get memos: %s", response.data)
+            return [], False
         
-        memos = []
         memo_list = response.data.get("memos", [])
-        
-        for memo_data in memo_list:
-            try:
-                memo = self._parse_memo_from_api(memo_data)
-                memos.append(memo)
-            except Exception as e:
-                logger.warning(f"Failed to parse memo: {e}")
-                continue
-        
-        return memos
+        return list(self._iter_memos(memo_list)), self._has_more(response.data, limit)
     
-    async def search_memos(self, query: SearchQuery) -> List[Memo]:
-        """Search memos by content and tags."""
-        url = f"{self.config.base_url}/api/{self.config.api_version}/memos"
+    async def search_memos(self, query: SearchQuery) -> Tuple[List[Memo], bool]:
+        """Search memos by content and tags.
+        
+        Returns:
+            The matching memos, and whether more results may be available
+        """
         params = {
             "pageSize": query.limit,
             "pageToken": str(query.offset) if query.offset > 0 else None,
@@ -192,72 +270,82 @@ class MemosClient:
         # Remove None values
         params = {k: v for k, v in params.items() if v is not None}
         
-        response = await self._make_request("GET", url, params=params)
+        response = await self._make_request("GET", self._memos_url, params=params)
         
         if not response.success:
-            logger.warning(f"Failed to search memos: {response.data}")
+            logger.warning("Failed to search memos: %s", response.data)
             # Fallback to client-side filtering
             return await self._client_side_search(query)
         
-        memos = []
+        filters = self._compile_filters(query)
         memo_list = response.data.get("memos", [])
-        
+        memos = list(self._iter_memos(
+            memo_list, lambda memo: self._matches_filters(memo, filters)
+        ))
+        return memos, self._has_more(response.data, query.limit)
+    
+    @staticmethod
+    def _has_more(data: Dict[str, Any], page_size: int) -> bool:
+        """Whether the API has another page after the one in ``data``."""
+        # Prefer the API's own pagination token; fall back to a full raw page
+        if "nextPageToken" in data:
+            return bool(data["nextPageToken"])
+        return len(data.get("memos", [])) >= page_size
+    
+    def _iter_memos(
+        self,
+        memo_list: List[Dict[str, Any]],
+        predicate: Optional[Callable[[Memo], bool]] = None
+    ) -> Iterator[Memo]:
+        """Parse API memo dicts one at a time, skipping any that fail to parse.
+        
+        If ``predicate`` is given, only memos it accepts are yielded. It runs
+        under the same per-memo guard, so a memo it fails on is skipped too.
+        """
         for memo_data in memo_list:
             try:
                 memo = self._parse_memo_from_api(memo_data)
-                if self._matches_filters(memo, query):
-                    memos.append(memo)
+                if predicate is not None and not predicate(memo):
+                    continue
             except Exception as e:
-                logger.warning(f"Failed to parse memo: {e}")
+                logger.warning("Failed to parse memo: %s", e)
                 continue
-        
-        return memos
+            yield memo
     
-    def _matches_filters(self, memo: Memo, query: SearchQuery) -> bool:
+    @staticmethod
+    def _compile_filters(query: SearchQuery) -> SearchFilters:
+        """Precompute the date bounds and tag set checked by _matches_filters."""
+        ts_from = int(query.date_from.timestamp()) if query.date_from else None
+        ts_to = int(query.date_to.timestamp()) if query.date_to else None
+        tag_set = frozenset(query.tags) if query.tags else None
+        return ts_from, ts_to, tag_set
+    
+    def _matches_filters(self, memo: Memo, filters: SearchFilters) -> bool:
         """Check if memo matches additional filters."""
+        ts_from, ts_to, tag_set = filters
+        
         # Date filtering
-        if query.date_from and memo.created_at and memo.created_at < query.date_from:
-            return False
-        if query.date_to and memo.created_at and memo.created_at > query.date_to:
-            return False
+        created_ts = memo.created_ts
+        if created_ts:
+            if ts_from is not None and created_ts < ts_from:
+                return False
+            if ts_to is not None and created_ts > ts_to:
+                return False
         
         # Tag filtering
-        if query.tags and not any(tag in memo.tags for tag in query.tags):
+        if tag_set and tag_set.isdisjoint(memo.tags):
             return False
         
         return True
     
     def _parse_memo_from_api(self, memo_data: Dict[str, Any]) -> Memo:
         """Parse memo from Memos API response data."""
-        import re
-        
-        # Extract content and tags
-        content = memo_data.get("content", "")
-        
-        # Extract hashtags from content
-        tag_matches = re.findall(r'#(\w+)', content)
-        tags = list(set(tag_matches))
-        
-        return Memo(
-            id=memo_data.get("id"),
-            uid=memo_data.get("uid"),
-            name=memo_data.get("name"),
-            row_status=memo_data.get("rowStatus"),
-            creator_id=memo_data.get("creatorId"),
-            creator_username=memo_data.get("creatorUsername"),
-            created_ts=memo_data.get("createdTs"),
-            updated_ts=memo_data.get("updatedTs"),
-            display_ts=memo_data.get("displayTs"),
-            content=content,
-            visibility=memo_data.get("visibility", "PRIVATE"),
-            tags=tags,
-            pinned=memo_data.get("pinned", False),
-            parent_id=memo_data.get("parentId"),
-            resources=memo_data.get("resources", []),
-            relations=memo_data.get("relations", []),
-            reactions=memo_data.get("reactions", []),
-            property=memo_data.get("property")
-        )
+        # Let Pydantic map the camelCase API keys in a single pass
+        memo = Memo.model_validate(memo_data)
+        
+        # Extract hashtags from content, de-duplicated in order of appearance
+        memo.tags = list(dict.fromkeys(_HASHTAG_RE.findall(memo.content)))
+        return memo
     
     def _build_search_filter(self, query: SearchQuery) -> str:
         """Build Memos API filter string for search."""
@@ -283,41 +371,42 @@ class MemosClient:
         
         return " && ".join(filters) if filters else ""
     
-    async def _client_side_search(self, query: SearchQuery) -> List[Memo]:
+    async def _client_side_search(self, query: SearchQuery) -> Tuple[List[Memo], bool]:
         """Fallback client-side search when server-side search fails."""
-        all_memos = await self.get_all_memos(limit=query.limit * 2, offset=query.offset)
+        all_memos, fetched_more = await self.get_all_memos(limit=query.limit * 2, offset=query.offset)
         
-        filtered_memos = []
         query_lower = query.query.lower()
+        filters = self._compile_filters(query)
+        tag_set = filters[2]
         
-        for memo in all_memos:
-            # Check content
-            if query_lower in memo.content.lower():
-                if self._matches_filters(memo, query):
-                    filtered_memos.append(memo)
-            # Check tags
-            elif query.tags and any(tag in memo.tags for tag in query.tags):
-                if self._matches_filters(memo, query):
-                    filtered_memos.append(memo)
-        
-        return filtered_memos[:query.limit]
+        # Lower-case every memo's content in one C-level pass
+        contents = map(str.lower, (memo.content for memo in all_memos))
+        
+        filtered_memos = [
+            memo for memo, content in zip(all_memos, contents)
+            # Match on content, or on tags when tags were requested
+            if (query_lower in content or (tag_set and not tag_set.isdisjoint(memo.tags)))
+            and self._matches_filters(memo, filters)
+        ]
+        
+        has_more = fetched_more or len(filtered_memos) > query.limit
+        return filtered_memos[:query.limit], has_more
     
     async def test_connection(self) -> bool:
         """Test if the client can connect to Memos API."""
         try:
             # Try to get current user to test authentication
-            url = f"{self.config.base_url}/api/{self.config.api_version}/user"
-            response = await self._make_request("GET", url)
+            response = await self._make_request("GET", self._user_url)
             return response.success
         except MemosAuthenticationError:
             return False
         except Exception as e:
-            logger.warning(f"Connection test failed: {e}")
+            logger.warning("Connection test failed: %s", e)
             return False
     
     async def get_memo_by_id(self, memo_id: int) -> Optional[Memo]:
         """Get a specific memo by its ID."""
-        url = f"{self.config.base_url}/api/{self.config.api_version}/memos/{memo_id}"
+        url = f"{self._memos_url}/{memo_id}"
         
         try:
             response = await self._make_request("GET", url)
@@ -327,5 +416,5 @@ class MemosClient:
             
             return self._parse_memo_from_api(response.data)
         except Exception as e:
-            logger.warning(f"Failed to get memo {memo_id}: {e}")
+            logger.warning("Failed to get memo %s: %s", memo_id, e)
             return None
\ No newline at end of file
@@ -1,25 +1,38 @@
 """Configuration management for Memos MCP server."""
 
-import hashlib
+import functools
 import os
-from typing import Optional
+from typing import Optional, Tuple, cast
 from dotenv import load_dotenv
-from .models import ApiConfig, ServerConfig
+# compute_token_hash is re-exported for backwards compatibility
+from .auth import compute_token_hash  # noqa: F401
+from .models import ApiConfig, LogLevel, ServerConfig
 
-# Load environment variables from .env file
-load_dotenv()
+# The .env file is loaded on first config access, keeping this import I/O-free
+_dotenv_loaded = False
 
 
+def _ensure_dotenv() -> None:
+    """Load environment variables from the .env file once per process."""
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        load_dotenv()
+        _dotenv_loaded = True
+
+
+@functools.lru_cache(maxsize=1)
 def get_api_config() -> ApiConfig:
     """Get API configuration from environment variables."""
-    access_token = os.getenv("MEMOS_ACCESS_TOKEN")
+    _ensure_dotenv()
+    env = os.environ
+    access_token = env.get("MEMOS_ACCESS_TOKEN")
     if not access_token:
         raise ValueError(
             "MEMOS_ACCESS_TOKEN environment variable is required. "
             "Get your token from your Memos instance settings."
         )
     
-    base_url = os.getenv("MEMOS_BASE_URL")
+    base_url = env.get("MEMOS_BASE_URL")
     if not base_url:
         raise ValueError(
             "MEMOS_BASE_URL environment variable is required. "
@@ -29,25 +42,29 @@ def get_api_config() -> ApiConfig:
     return ApiConfig(
         access_token=access_token,
         base_url=base_url,
-        api_version=os.getenv("MEMOS_API_VERSION", "v1"),
-        timeout=int(os.getenv("MEMOS_TIMEOUT", "30")),
-        max_retries=int(os.getenv("MEMOS_MAX_RETRIES", "3")),
+        api_version=env.get("MEMOS_API_VERSION", "v1"),
+        timeout=int(env.get("MEMOS_TIMEOUT", "30")),
+        max_retries=int(env.get("MEMOS_MAX_RETRIES", "3")),
     )
 
 
+@functools.lru_cache(maxsize=1)
 def get_server_config() -> ServerConfig:
     """Get server configuration from environment variables."""
-    cors_origins = []
-    cors_env = os.getenv("CORS_ORIGINS", "")
-    if cors_env:
-        cors_origins = [origin.strip() for origin in cors_env.split(",") if origin.strip()]
+    _ensure_dotenv()
+    env = os.environ
+    # Strip each origin once, dropping empty entries
+    origins = (origin.strip() for origin in env.get("CORS_ORIGINS", "").split(","))
+    cors_origins = tuple(origin for origin in origins if origin)
     
     return ServerConfig(
-        host=os.getenv("SERVER_HOST", "localhost"),
-        port=int(os.getenv("SERVER_PORT", "8000")),
-        log_level=os.getenv("LOG_LEVEL", "INFO"),
+        host=env.get("SERVER_HOST", "localhost"),
+        port=int(env.get("SERVER_PORT", "8000")),
+        # Log levels are accepted in any case, as logging itself does;
+        # ServerConfig still rejects values outside LogLevel
+        log_level=cast(LogLevel, env.get("LOG_LEVEL", "INFO").upper()),
         cors_origins=cors_origins,
-        api_rate_limit=int(os.getenv("API_RATE_LIMIT", "100")),
+        api_rate_limit=int(env.get("API_RATE_LIMIT", "100")),
     )
 
 
@@ -97,21 +114,21 @@ ENABLE_TOKEN_AUTH=true
 """
 
 
+@functools.lru_cache(maxsize=1)
 def get_auth_enabled() -> bool:
     """Check if token authentication is enabled."""
-    return os.getenv("ENABLE_TOKEN_AUTH", "true").lower() in ("true", "1", "yes")
-
+    _ensure_dotenv()
+    return os.environ.get("ENABLE_TOKEN_AUTH", "true").lower() in ("true", "1", "yes")
 
-def compute_token_hash(token: str) -> str:
-    """Compute SHA256 hash of the access token."""
-    return hashlib.sha256(token.encode()).hexdigest()
 
-
-def validate_environment() -> None:
-    """Validate that all required environment variables are set."""
+def validate_environment() -> Tuple[ApiConfig, ServerConfig]:
+    """Validate that all required environment variables are set.
+    
+    Returns:
+        The validated API and server configuration
+    """
     try:
-        get_api_config()
-        get_server_config()
+        return get_api_config(), get_server_config()
     except ValueError as e:
         print(f"Configuration error: {e}")
         print("\nTo fix this, create a .env file with the following content:")
@@ -1,30 +1,56 @@
 """Pydantic models for Memos MCP server."""
 
+import re
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field, field_validator
+from functools import lru_cache
+from typing import List, Literal, Optional, Dict, Any, Tuple
+from pydantic import BaseModel, ConfigDict, Field, SkipValidation, field_validator
+
+# A tag is a run of characters other than whitespace and commas; leading '#'
+# characters are dropped, while '#' inside a tag (e.g. "c#") is kept
+_TAG_RE = re.compile(r'#*([^\s,#][^\s,]*)')
+
+# Closed value sets, validated by pydantic-core without a Python validator
+Visibility = Literal["PRIVATE", "PROTECTED", "PUBLIC"]
+LogLevel = Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+
+
+@lru_cache(maxsize=1024)
+def _timestamp_to_datetime(ts: int) -> datetime:
+    """Convert a Unix timestamp to a local datetime (cached; datetimes are immutable)."""
+    return datetime.fromtimestamp(ts)
+
+
+def split_tags(value: str) -> List[str]:
+    """Split a comma- or space-separated tag string, dropping '#' prefixes."""
+    return _TAG_RE.findall(value)
 
 
 class Memo(BaseModel):
     """Represents a Memos memo."""
     
+    # Accept the camelCase keys of the Memos API directly, as well as field names
+    model_config = ConfigDict(populate_by_name=True, extra="ignore", str_strip_whitespace=True)
+    
     id: Optional[int] = None
     uid: Optional[str] = None
     name: Optional[str] = None
-    row_status: Optional[str] = Field(None, description="Row status (NORMAL, ARCHIVED)")
-    creator_id: Optional[int] = None
-    creator_username: Optional[str] = None
-    created_ts: Optional[int] = None
-    updated_ts: Optional[int] = None
-    display_ts: Optional[int] = None
-    content: str = Field(..., description="The main content of the memo")
+    row_status: Optional[str] = Field(None, validation_alias="rowStatus", description="Row status (NORMAL, ARCHIVED)")
+    creator_id: Optional[int] = Field(None, validation_alias="creatorId")
+    creator_username: Optional[str] = Field(None, validation_alias="creatorUsername")
+    created_ts: Optional[int] = Field(None, validation_alias="createdTs")
+    updated_ts: Optional[int] = Field(None, validation_alias="updatedTs")
+    display_ts: Optional[int] = Field(None, validation_alias="displayTs")
+    content: str = Field(..., min_length=1, description="The main content of the memo")
+    # Left open: API data may carry values such as VISIBILITY_UNSPECIFIED
     visibility: Optional[str] = Field("PRIVATE", description="Visibility (PRIVATE, PROTECTED, PUBLIC)")
     tags: List[str] = Field(default_factory=list, description="Tags associated with the memo")
     pinned: bool = Field(False, description="Whether the memo is pinned")
-    parent_id: Optional[int] = Field(None, description="Parent memo ID for replies")
-    resources: List[dict] = Field(default_factory=list, description="Attached resources")
-    relations: List[dict] = Field(default_factory=list, description="Memo relations")
-    reactions: List[dict] = Field(default_factory=list, description="Memo reactions")
+    parent_id: Optional[int] = Field(None, validation_alias="parentId", description="Parent memo ID for replies")
+    # Opaque API payloads: kept as the decoded dicts rather than copied item by item
+    resources: SkipValidation[List[dict]] = Field(default_factory=list, description="Attached resources")
+    relations: SkipValidation[List[dict]] = Field(default_factory=list, description="Memo relations")
+    reactions: SkipValidation[List[dict]] = Field(default_factory=list, description="Memo reactions")
     property: Optional[dict] = Field(None, description="Additional properties")
     
     def get_text(self) -> str:
@@ -33,15 +59,24 @@ class Memo(BaseModel):
     
     def get_created_at(self) -> Optional[datetime]:
         """Convert created timestamp to datetime."""
-        if self.created_ts:
-            return datetime.fromtimestamp(self.created_ts)
-        return None
+        # Computed from the current field value, so edits and model_copy stay in sync
+        return _timestamp_to_datetime(self.created_ts) if self.created_ts else None
     
     def get_updated_at(self) -> Optional[datetime]:
         """Convert updated timestamp to datetime."""
-        if self.updated_ts:
-            return datetime.fromtimestamp(self.updated_ts)
-        return None
+        return _timestamp_to_datetime(self.updated_ts) if self.updated_ts else None
+    
+    @field_validator("resources", "relations", "reactions", mode="before")
+    @classmethod
+    def parse_payload_list(cls, v):
+        """Keep API payload lists as-is, dropping anything that is not a dict."""
+        # These fields skip validation, so malformed API values must be
+        # normalised here or the tool result would break its output schema
+        if not isinstance(v, list):
+            return []
+        if all(isinstance(item, dict) for item in v):
+            return v
+        return [item for item in v if isinstance(item, dict)]
     
     @field_validator("tags", mode="before")
     @classmethod
@@ -49,35 +84,21 @@ class Memo(BaseModel):
         """Parse tags from various input formats."""
         if isinstance(v, str):
             # Handle comma-separated or space-separated tags
-            return [tag.strip().lstrip('#') for tag in v.replace(',', ' ').split() if tag.strip()]
+            return split_tags(v)
         elif isinstance(v, list):
-            return [str(tag).strip().lstrip('#') for tag in v if str(tag).strip()]
+            return [tag for tag in (str(item).strip().lstrip('#') for item in v) if tag]
         return []
 
-    @field_validator("content")
-    @classmethod
-    def validate_text(cls, v):
-        """Ensure text is not empty."""
-        if not v or not v.strip():
-            raise ValueError("Memo text cannot be empty")
-        return v.strip()
-
 
 class CreateMemoRequest(BaseModel):
     """Request model for creating a new memo."""
     
-    content: str = Field(..., description="The content of the memo to create")
-    visibility: str = Field("PRIVATE", description="Visibility (PRIVATE, PROTECTED, PUBLIC)")
+    model_config = ConfigDict(str_strip_whitespace=True)
+    
+    content: str = Field(..., min_length=1, description="The content of the memo to create")
+    visibility: Visibility = Field("PRIVATE", description="Visibility (PRIVATE, PROTECTED, PUBLIC)")
     tags: Optional[List[str]] = Field(default_factory=list, description="Optional tags for the memo")
     pinned: bool = Field(False, description="Whether to pin the memo")
-    
-    @field_validator("content")
-    @classmethod
-    def validate_content(cls, v):
-        """Ensure content is not empty."""
-        if not v or not v.strip():
-            raise ValueError("Memo content cannot be empty")
-        return v.strip()
 
 
 class MemoResponse(BaseModel):
@@ -104,20 +125,14 @@ class MemoListResponse(BaseModel):
 class SearchQuery(BaseModel):
     """Search parameters for finding memos."""
     
-    query: str = Field(..., description="Search text to find in memo content")
+    model_config = ConfigDict(str_strip_whitespace=True)
+    
+    query: str = Field(..., min_length=1, description="Search text to find in memo content")
     tags: Optional[List[str]] = Field(default_factory=list, description="Filter by specific tags")
     limit: int = Field(50, description="Maximum number of results to return", ge=1, le=200)
     offset: int = Field(0, description="Number of results to skip", ge=0)
     date_from: Optional[datetime] = Field(None, description="Filter memos created after this date")
     date_to: Optional[datetime] = Field(None, description="Filter memos created before this date")
-    
-    @field_validator("query")
-    @classmethod
-    def validate_query(cls, v):
-        """Ensure query is not empty."""
-        if not v or not v.strip():
-            raise ValueError("Search query cannot be empty")
-        return v.strip()
 
 
 class MemosApiResponse(BaseModel):
@@ -132,43 +147,29 @@ class MemosApiResponse(BaseModel):
 class ApiConfig(BaseModel):
     """Configuration for Memos API client."""
     
-    access_token: str = Field(..., description="Access token for Memos API authentication")
-    base_url: str = Field(..., description="Base URL for Memos instance")
+    # Immutable so a single cached instance can be shared process-wide
+    model_config = ConfigDict(frozen=True, str_strip_whitespace=True)
+    
+    access_token: str = Field(..., min_length=1, description="Access token for Memos API authentication")
+    base_url: str = Field(..., min_length=1, description="Base URL for Memos instance")
     api_version: str = Field("v1", description="API version to use")
     timeout: int = Field(30, description="Request timeout in seconds", ge=1, le=300)
     max_retries: int = Field(3, description="Maximum number of retry attempts", ge=0, le=10)
     
-    @field_validator("access_token")
-    @classmethod
-    def validate_token(cls, v):
-        """Ensure access token is provided."""
-        if not v or not v.strip():
-            raise ValueError("Access token is required")
-        return v.strip()
-    
     @field_validator("base_url")
     @classmethod
     def validate_base_url(cls, v):
-        """Ensure base URL is provided and properly formatted."""
-        if not v or not v.strip():
-            raise ValueError("Base URL is required")
+        """Ensure base URL is properly formatted."""
         return v.rstrip('/')
 
 
 class ServerConfig(BaseModel):
     """Configuration for the MCP server."""
     
+    model_config = ConfigDict(frozen=True)
+    
     host: str = Field("localhost", description="Server host address")
     port: int = Field(8000, description="Server port number", ge=1, le=65535)
-    log_level: str = Field("INFO", description="Logging level")
-    cors_origins: List[str] = Field(default_factory=list, description="CORS allowed origins")
+    log_level: LogLevel = Field("INFO", description="Logging level")
+    cors_origins: Tuple[str, ...] = Field((), description="CORS allowed origins")
     api_rate_limit: int = Field(100, description="API rate limit per minute", ge=1)
-    
-    @field_validator("log_level")
-    @classmethod
-    def validate_log_level(cls, v):
-        """Ensure valid log level."""
-        valid_levels = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
-        if v.upper() not in valid_levels:
-            raise ValueError(f"Log level must be one of: {', '.join(valid_levels)}")
-        return v.upper()
\ No newline at end of file
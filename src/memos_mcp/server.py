@@ -1,66 +1,128 @@
 """FastMCP server implementation for Memos with streaming endpoints."""
 
 import asyncio
+import functools
 import logging
-from typing import List, Optional, AsyncGenerator
+import weakref
 from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional, Type, TypeVar
 
 from fastmcp import FastMCP
-from pydantic import ValidationError
 
+from . import __version__
 from .client import MemosClient, MemosAPIError, MemosAuthenticationError
-from .config import get_api_config, validate_environment
+from .config import get_api_config, get_auth_enabled
 from .models import (
-    Memo,
     CreateMemoRequest,
     MemoResponse,
     MemoListResponse,
     SearchQuery,
-    ApiConfig,
+    split_tags,
 )
-from .auth import TokenAuthMiddleware
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Global client instance
-_memos_client: Optional[MemosClient] = None
+# Shared client instances, one per event loop: an httpx connection pool is
+# bound to the loop it was first used on and must not be shared across loops
+_memos_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, MemosClient]" = (
+    weakref.WeakKeyDictionary()
+)
 
+# Client pre-built by create_app; the server lifespan binds it to the serving loop
+_app_client: Optional[MemosClient] = None
 
-@asynccontextmanager
-async def get_memos_client() -> AsyncGenerator[MemosClient, None]:
-    """Get or create a Memos client instance."""
-    global _memos_client
+
+async def get_memos_client() -> MemosClient:
+    """Get or create the Memos client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _memos_clients.get(loop)
     
-    if _memos_client is None:
+    # No await between the lookup and the store, so concurrent first calls
+    # on the same loop cannot both construct a client
+    if client is None:
         try:
-            config = get_api_config()
-            _memos_client = MemosClient(config)
+            client = _memos_clients[loop] = MemosClient(get_api_config())
         except Exception as e:
-            logger.error(f"Failed to create Memos client: {e}")
+            logger.error("Failed to create Memos client: %s", e)
             raise
     
-    try:
-        yield _memos_client
-    finally:
-        # Keep client alive for reuse
-        pass
+    return client
 
 
 async def cleanup_client() -> None:
-    """Cleanup the global client instance."""
-    global _memos_client
-    if _memos_client:
-        await _memos_client.close()
-        _memos_client = None
+    """Cleanup the client instance of the running event loop."""
+    client = _memos_clients.pop(asyncio.get_running_loop(), None)
+    if client:
+        await client.close()
+
+
+AUTH_FAILED_MESSAGE = "Authentication failed. Please check your access token."
+
+ResponseT = TypeVar("ResponseT", MemoResponse, MemoListResponse)
+
+
+def _failure_response(response_cls: Type[ResponseT], message: str, error: str) -> ResponseT:
+    """Build a failed MemoResponse or MemoListResponse."""
+    if response_cls is MemoListResponse:
+        return MemoListResponse(success=False, memos=[], total=0, error=error)
+    return MemoResponse(success=False, message=message, error=error)
+
+
+def tool_error_handler(response_cls: Type[ResponseT], action: str):
+    """
+    Convert exceptions raised by a tool into a failed response.
+    
+    Args:
+        response_cls: The tool's response model (MemoResponse or MemoListResponse)
+        action: Short description of the tool's operation, e.g. "create memo"
+    """
+    def decorator(
+        fn: Callable[..., Awaitable[ResponseT]]
+    ) -> Callable[..., Awaitable[ResponseT]]:
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs) -> ResponseT:
+            try:
+                return await fn(*args, **kwargs)
+            except MemosAuthenticationError as e:
+                logger.error("Authentication error: %s", e)
+                # List responses have no message field, so report the hint as the error
+                error = AUTH_FAILED_MESSAGE if response_cls is MemoListResponse else str(e)
+                return _failure_response(response_cls, AUTH_FAILED_MESSAGE, error)
+            except MemosAPIError as e:
+                logger.error("Memos API error: %s", e)
+                return _failure_response(response_cls, f"Failed to {action}", str(e))
+            except Exception as e:
+                logger.error("Unexpected error trying to %s: %s", action, e)
+                return _failure_response(response_cls, "An unexpected error occurred", str(e))
+        
+        return wrapper
+    
+    return decorator
+
+
+@asynccontextmanager
+async def _lifespan(server: FastMCP):
+    """Adopt the client built by create_app and close the loop's client on shutdown."""
+    global _app_client
+    
+    if _app_client is not None:
+        _memos_clients[asyncio.get_running_loop()] = _app_client
+        _app_client = None
+    
+    try:
+        yield {}
+    finally:
+        await cleanup_client()
 
 
 # Initialize FastMCP app
-app = FastMCP("Memos MCP Server")
+app = FastMCP("Memos MCP Server", lifespan=_lifespan)
 
 
 @app.tool()
+@tool_error_handler(MemoResponse, "create memo")
 async def create_memo(request: CreateMemoRequest) -> MemoResponse:
     """
     Create a new memo in Memos.
@@ -71,40 +133,18 @@ async def create_memo(request: CreateMemoRequest) -> MemoResponse:
     Returns:
         MemoResponse with the created memo details
     """
-    try:
-        async with get_memos_client() as client:
-            memo = await client.create_memo(request)
-            
-            return MemoResponse(
-                success=True,
-                message="Memo created successfully",
-                memo=memo
-            )
-            
-    except MemosAuthenticationError as e:
-        logger.error(f"Authentication error: {e}")
-        return MemoResponse(
-            success=False,
-            message="Authentication failed. Please check your access token.",
-            error=str(e)
-        )
-    except MemosAPIError as e:
-        logger.error(f"Memos API error: {e}")
-        return MemoResponse(
-            success=False,
-            message="Failed to create memo",
-            error=str(e)
-        )
-    except Exception as e:
-        logger.error(f"Unexpected error creating memo: {e}")
-        return MemoResponse(
-            success=False,
-            message="An unexpected error occurred",
-            error=str(e)
-        )
+    client = await get_memos_client()
+    memo = await client.create_memo(request)
+    
+    return MemoResponse.model_construct(
+        success=True,
+        message="Memo created successfully",
+        memo=memo
+    )
 
 
 @app.tool()
+@tool_error_handler(MemoListResponse, "list memos")
 async def list_memos(
     limit: int = 50,
     offset: int = 0
@@ -136,46 +176,22 @@ async def list_memos(
             error="Offset must be non-negative"
         )
     
-    try:
-        async with get_memos_client() as client:
-            memos = await client.get_all_memos(limit=limit, offset=offset)
-            
-            return MemoListResponse(
-                success=True,
-                memos=memos,
-                total=len(memos),
-                page=offset // limit + 1,
-                page_size=limit,
-                has_more=len(memos) == limit
-            )
-            
-    except MemosAuthenticationError as e:
-        logger.error(f"Authentication error: {e}")
-        return MemoListResponse(
-            success=False,
-            memos=[],
-            total=0,
-            error="Authentication failed. Please check your access token."
-        )
-    except MemosAPIError as e:
-        logger.error(f"Memos API error: {e}")
-        return MemoListResponse(
-            success=False,
-            memos=[],
-            total=0,
-            error=str(e)
-        )
-    except Exception as e:
-        logger.error(f"Unexpected error listing memos: {e}")
-        return MemoListResponse(
-            success=False,
-            memos=[],
-            total=0,
-            error=str(e)
-        )
+    client = await get_memos_client()
+    memos, has_more = await client.get_all_memos(limit=limit, offset=offset)
+    
+    # Memos were validated when parsed by the client; skip revalidation
+    return MemoListResponse.model_construct(
+        success=True,
+        memos=memos,
+        total=len(memos),
+        page=offset // limit + 1 if offset else 1,
+        page_size=limit,
+        has_more=has_more
+    )
 
 
 @app.tool()
+@tool_error_handler(MemoListResponse, "search memos")
 async def search_memos(query: SearchQuery) -> MemoListResponse:
     """
     Search memos by content and tags.
@@ -186,54 +202,21 @@ async def search_memos(query: SearchQuery) -> MemoListResponse:
     Returns:
         MemoListResponse with matching memos
     """
-    try:
-        async with get_memos_client() as client:
-            memos = await client.search_memos(query)
-            
-            return MemoListResponse(
-                success=True,
-                memos=memos,
-                total=len(memos),
-                page=query.offset // query.limit + 1,
-                page_size=query.limit,
-                has_more=len(memos) == query.limit
-            )
-            
-    except ValidationError as e:
-        logger.error(f"Validation error: {e}")
-        return MemoListResponse(
-            success=False,
-            memos=[],
-            total=0,
-            error=f"Invalid search parameters: {e}"
-        )
-    except MemosAuthenticationError as e:
-        logger.error(f"Authentication error: {e}")
-        return MemoListResponse(
-            success=False,
-            memos=[],
-            total=0,
-            error="Authentication failed. Please check your access token."
-        )
-    except MemosAPIError as e:
-        logger.error(f"Memos API error: {e}")
-        return MemoListResponse(
-            success=False,
-            memos=[],
-            total=0,
-            error=str(e)
-        )
-    except Exception as e:
-        logger.error(f"Unexpected error searching memos: {e}")
-        return MemoListResponse(
-            success=False,
-            memos=[],
-            total=0,
-            error=str(e)
-        )
+    client = await get_memos_client()
+    memos, has_more = await client.search_memos(query)
+    
+    return MemoListResponse.model_construct(
+        success=True,
+        memos=memos,
+        total=len(memos),
+        page=query.offset // query.limit + 1 if query.offset else 1,
+        page_size=query.limit,
+        has_more=has_more
+    )
 
 
 @app.tool()
+@tool_error_handler(MemoResponse, "get memo")
 async def get_memo_by_id(memo_id: int) -> MemoResponse:
     """
     Get a specific memo by its ID.
@@ -251,43 +234,20 @@ async def get_memo_by_id(memo_id: int) -> MemoResponse:
             error="Invalid memo ID"
         )
     
-    try:
-        async with get_memos_client() as client:
-            memo = await client.get_memo_by_id(memo_id)
-            
-            if memo:
-                return MemoResponse(
-                    success=True,
-                    message="Memo found",
-                    memo=memo
-                )
-            else:
-                return MemoResponse(
-                    success=False,
-                    message="Memo not found",
-                    error=f"No memo found with ID: {memo_id}"
-                )
-            
-    except MemosAuthenticationError as e:
-        logger.error(f"Authentication error: {e}")
-        return MemoResponse(
-            success=False,
-            message="Authentication failed. Please check your access token.",
-            error=str(e)
-        )
-    except MemosAPIError as e:
-        logger.error(f"Memos API error: {e}")
-        return MemoResponse(
-            success=False,
-            message="Failed to get memo",
-            error=str(e)
+    client = await get_memos_client()
+    memo = await client.get_memo_by_id(memo_id)
+    
+    if memo:
+        return MemoResponse.model_construct(
+            success=True,
+            message="Memo found",
+            memo=memo
         )
-    except Exception as e:
-        logger.error(f"Unexpected error getting memo: {e}")
+    else:
         return MemoResponse(
             success=False,
-            message="An unexpected error occurred",
-            error=str(e)
+            message="Memo not found",
+            error=f"No memo found with ID: {memo_id}"
         )
 
 
@@ -311,9 +271,7 @@ async def quick_memo(content: str, tags: Optional[str] = None) -> MemoResponse:
         )
     
     # Parse tags
-    tag_list = []
-    if tags:
-        tag_list = [tag.strip().lstrip('#') for tag in tags.replace(',', ' ').split() if tag.strip()]
+    tag_list = split_tags(tags) if tags else []
     
     request = CreateMemoRequest(
         content=content.strip(),
@@ -333,23 +291,23 @@ async def test_connection() -> dict:
         Dictionary with connection status and details
     """
     try:
-        async with get_memos_client() as client:
-            is_connected = await client.test_connection()
+        client = await get_memos_client()
+        is_connected = await client.test_connection()
+        
+        if is_connected:
+            return {
+                "success": True,
+                "message": "Successfully connected to Memos API",
+                "status": "connected"
+            }
+        else:
+            return {
+                "success": False,
+                "message": "Failed to connect to Memos API",
+                "status": "disconnected",
+                "error": "Connection test failed"
+            }
             
-            if is_connected:
-                return {
-                    "success": True,
-                    "message": "Successfully connected to Memos API",
-                    "status": "connected"
-                }
-            else:
-                return {
-                    "success": False,
-                    "message": "Failed to connect to Memos API",
-                    "status": "disconnected",
-                    "error": "Connection test failed"
-                }
-                
     except MemosAuthenticationError as e:
         return {
             "success": False,
@@ -358,7 +316,7 @@ async def test_connection() -> dict:
             "error": str(e)
         }
     except Exception as e:
-        logger.error(f"Connection test error: {e}")
+        logger.error("Connection test error: %s", e)
         return {
             "success": False,
             "message": "Connection test failed",
@@ -370,6 +328,23 @@ async def test_connection() -> dict:
 # Health check removed - not supported in FastMCP
 
 
+# Static portion of get_server_info, built once at import
+_SERVER_INFO_BASE = {
+    "name": "Memos MCP Server",
+    "version": __version__,
+    "description": "A streamable HTTP MCP server for Memos note-taking app",
+    "tools": (
+        "create_memo",
+        "list_memos",
+        "search_memos",
+        "get_memo_by_id",
+        "quick_memo",
+        "test_connection",
+        "get_server_info",
+    ),
+}
+
+
 @app.tool()
 async def get_server_info() -> dict:
     """
@@ -381,48 +356,41 @@ async def get_server_info() -> dict:
     try:
         config = get_api_config()
         return {
-            "name": "Memos MCP Server",
-            "version": "0.1.0",
-            "description": "A streamable HTTP MCP server for Memos note-taking app",
+            **_SERVER_INFO_BASE,
             "base_url": config.base_url,
             "api_version": config.api_version,
-            "tools": [
-                "create_memo",
-                "list_memos", 
-                "search_memos",
-                "get_memo_by_id",
-                "quick_memo",
-                "test_connection",
-                "get_server_info"
-            ]
         }
     except Exception as e:
         return {
-            "name": "Memos MCP Server",
-            "version": "0.1.0",
+            "name": _SERVER_INFO_BASE["name"],
+            "version": _SERVER_INFO_BASE["version"],
             "error": str(e)
         }
 
 
-# Startup and shutdown events removed - not supported in FastMCP
-
-
 # Export the app for running
 def create_app():
     """Create and return the FastMCP ASGI app with optional authentication."""
-    import os
+    global _app_client
+    from .auth import TokenAuthMiddleware
     
     # Get the base FastMCP HTTP app
     http_app = app.http_app()
     
+    try:
+        api_config = get_api_config()
+    except Exception as e:
+        logger.warning("Could not load API configuration: %s", e)
+        api_config = None
+    else:
+        # Build the Memos client up front so the first tool call finds it ready
+        _app_client = MemosClient(api_config)
+    
     # Check if authentication should be enabled
-    auth_enabled = os.getenv("ENABLE_TOKEN_AUTH", "true").lower() in ("true", "1", "yes")
+    auth_enabled = get_auth_enabled()
     
     if auth_enabled:
-        try:
-            # Get access token for authentication
-            api_config = get_api_config()
-            
+        if api_config is not None:
             # Wrap the HTTP app with authentication middleware
             authenticated_app = TokenAuthMiddleware(
                 http_app,
@@ -432,17 +400,20 @@ def create_app():
             
             logger.info("HTTP authentication middleware enabled")
             return authenticated_app
-        except Exception as e:
-            logger.warning("Could not enable authentication: %s. Running without authentication.", e)
+        logger.warning("Could not enable authentication. Running without authentication.")
     
     return http_app
 
-# Export for uvicorn
-http_app = create_app()
+def __getattr__(name: str):
+    """Build the ``http_app`` export for uvicorn on first access (PEP 562)."""
+    if name == "http_app":
+        # Cache in module globals so later lookups bypass this hook
+        value = globals()["http_app"] = create_app()
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
-    import uvicorn
     from .config import get_server_config
     
     try:
@@ -454,5 +425,5 @@ if __name__ == "__main__":
             port=server_config.port
         )
     except Exception as e:
-        logger.error(f"Failed to start server: {e}")
+        logger.error("Failed to start server: %s", e)
         exit(1)
\ No newline at end of file